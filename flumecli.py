@@ -56,6 +56,24 @@ def checkparams():
         help="Enter end date in YYYY-MM-DD format",
     )
 
+    parser.add_argument(
+        "--adaptive",
+        help="With --query, back off to longer windows while flow is zero and catch up on the idle period once usage appears",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--pollstatefile",
+        default="flume.pollstate",
+        help="Adaptive polling state file, default is flume.pollstate",
+    )
+    parser.add_argument(
+        "--maxWindow",
+        dest="maxWindow",
+        type=int,
+        default=60,
+        help="Longest idle window in minutes for --adaptive, default is 60",
+    )
+
     parser.add_argument("--verbose", "-v", help="Add verbosity", action="store_true")
     parser.add_argument(
         "--interval",
@@ -100,6 +118,9 @@ def checkparams():
     config["endDate"] = args.endDate
     config["verbose"] = args.verbose
     config["interval"] = args.interval
+    config["adaptive"] = args.adaptive
+    config["pollstatefile"] = args.pollstatefile
+    config["maxWindow"] = max(1, args.maxWindow)
 
     if args.auth:
         config["mode"] = "auth"
@@ -306,6 +327,96 @@ def getWaterFlowLastMinute():
         return None
 
 
+def loadPollState():
+    try:
+        with open(config["pollstatefile"], "r") as f:
+            state = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        logging.debug(f"No usable poll state in: <{config['pollstatefile']}>")
+        return {"since": None, "window": 1}
+    return state
+
+
+def savePollState(state):
+    logging.debug(f"Saving poll state to: <{config['pollstatefile']}>: {state}")
+    with open(config["pollstatefile"], "w") as f:
+        f.write(json.dumps(state))
+
+
+def getWaterFlowAdaptive():
+    """Query per-minute flow only when the current polling window is due.
+
+    The whole period since the last stored minute is fetched in one query.
+    Any flow resets the window to one minute, otherwise it doubles up to
+    --maxWindow.  Idle windows store only their last minute.
+    """
+    state = loadPollState()
+    now = datetime.datetime.now().replace(second=0, microsecond=0)
+    untilTime = now - datetime.timedelta(minutes=1)  # last complete minute
+    if state["since"]:
+        sinceTime = datetime.datetime.strptime(state["since"], "%Y-%m-%d %H:%M:%S")
+    else:
+        sinceTime = untilTime
+    window = state["window"]
+
+    elapsed = untilTime - sinceTime + datetime.timedelta(minutes=1)
+    if elapsed < datetime.timedelta(minutes=window):
+        logging.info(
+            f"Skipping query, {elapsed} elapsed of {window} minute window since {state['since']}"
+        )
+        return None
+    # A single MIN query returns at most 1200 records.
+    sinceTime = max(sinceTime, untilTime - datetime.timedelta(minutes=1199))
+
+    getDevices(config)
+
+    payload = (
+        '{"queries":[{"request_id":"perminute","bucket":"MIN","since_datetime":"'
+        + sinceTime.strftime("%Y-%m-%d %H:%M:%S")
+        + '","until_datetime":"'
+        + untilTime.strftime("%Y-%m-%d %H:%M:%S")
+        + '","group_multiplier":"1","sort_direction":"ASC","units":"GALLONS"}]}'
+    )
+    headers = buildRequestHeader()
+    headers["content-type"] = "application/json"
+    resp = requests.request(
+        "POST",
+        "https://api.flumetech.com/users/"
+        + str(config["user_id"])
+        + "/devices/"
+        + str(config["device_id"])
+        + "/query",
+        data=payload,
+        headers=headers,
+    )
+    data = json.loads(resp.text)
+    if data["http_code"] != 200:
+        logging.debug(f"Adaptive query failed: {data}")
+        return None
+
+    entries = data["data"][0]["perminute"]
+    if not entries:
+        return None
+    if any(entry["value"] for entry in entries):
+        window = 1
+    else:
+        window = min(window * 2, config["maxWindow"])
+        entries = entries[-1:]
+    lastTime = datetime.datetime.strptime(
+        entries[-1]["datetime"][0:19], "%Y-%m-%d %H:%M:%S"
+    )
+    savePollState(
+        {
+            "since": (lastTime + datetime.timedelta(minutes=1)).strftime(
+                "%Y-%m-%d %H:%M:%S"
+            ),
+            "window": window,
+        }
+    )
+    logging.info(f"Next adaptive window is {window} minute(s)")
+    return [entries]
+
+
 def append_db(rawdata):
     DB = TinyDB(config["appendDB"])
     WATER_USAGE_TABLE = DB.table(config["table"])
@@ -391,7 +502,7 @@ def getBulkData():
 
 
 def transmitFlow(flowValue):
-    if config["appendDB"]:
+    if config["appendDB"] and flowValue:
         append_db(flowValue)
 
 
@@ -419,8 +530,11 @@ def main():
 
     if config["mode"] == "query":
         loadCredentials(config)
-        getDevices(config)
-        transmitFlow(getWaterFlowLastMinute())
+        if config["adaptive"]:
+            transmitFlow(getWaterFlowAdaptive())
+        else:
+            getDevices(config)
+            transmitFlow(getWaterFlowLastMinute())
 
     if config["mode"] == "getBulkData":
         loadCredentials(config)